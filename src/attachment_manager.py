@@ -19,16 +19,20 @@ Attachment Manager - Discord附件文件管理系统
 
 import os
 import sys
+import time
 import secrets
 import logging
 import asyncio
 from pathlib import Path
 from datetime import datetime, timedelta
+from itertools import count
 from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 
-# 添加包根目录（相对导入支持）
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加包根目录（相对导入支持，避免重复插入导致sys.path膨胀）
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 try:
     import aiohttp
@@ -36,11 +40,23 @@ except ImportError:
     print("Error: aiohttp is not installed. Run: pip install aiohttp")
     sys.exit(1)
 
+try:
+    import aiofiles
+    from aiofiles import os as aio_os
+except ImportError:
+    print("Error: aiofiles is not installed. Run: pip install aiofiles")
+    sys.exit(1)
+
 from config.settings import SettingsManager
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# 文件名用时间戳格式与进程内单调计数器
+# （同一秒内的突发上传也由计数器保证唯一性）
+_FILENAME_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+_filename_counter = count()
+
 @dataclass
 class FileMetadata:
     """
@@ -70,8 +86,8 @@ class FileValidator:
     - 自定义验证规则
     """
 
-    # 支持的图像格式（可扩展）
-    SUPPORTED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.tiff'}
+    # 支持的图像格式（可扩展、不可变集合表明只读意图）
+    SUPPORTED_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.tiff'})
 
     # 文件大小限制（遵循Discord限制，将来可配置）
     MAX_FILE_SIZE = 8 * 1024 * 1024  # 8MB
@@ -86,7 +102,8 @@ class FileValidator:
         - MIME type验证
         - 自定义格式定义
         """
-        return Path(filename).suffix.lower() in cls.SUPPORTED_EXTENSIONS
+        # os.path.splitext是纯字符串操作，避免每次验证构造Path对象
+        return os.path.splitext(filename)[1].lower() in cls.SUPPORTED_EXTENSIONS
 
     @classmethod
     def is_valid_size(cls, size: int) -> bool:
@@ -148,15 +165,37 @@ class FileNamingStrategy:
         Returns:
             str: 生成的唯一文件名
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        random_suffix = secrets.token_hex(3)  # 6字符的随机字符串
-        extension = Path(original_name).suffix.lower()
+        # time.strftime直接格式化struct_time，无需构造datetime对象
+        timestamp = time.strftime(_FILENAME_TIMESTAMP_FORMAT)
+        random_suffix = secrets.token_hex(2)  # 4字符的随机字符串
 
         # 扩展名不存在时的默认处理
-        if not extension:
-            extension = '.bin'
+        extension = os.path.splitext(original_name)[1].lower() or '.bin'
+
+        return f"IMG_{timestamp}_{next(_filename_counter):06x}_{random_suffix}{extension}"
+
+    @staticmethod
+    def generate_batch_filenames(original_names: List[str]) -> List[str]:
+        """
+        为一批文件一次性生成唯一文件名
+
+        时间戳只取一次，单调计数器保证跨批次·同一秒内也无冲突，
+        避免每个文件重复读取时钟与格式化。
+
+        Args:
+            original_names: 原始文件名的列表
 
-        return f"IMG_{timestamp}_{random_suffix}{extension}"
+        Returns:
+            List[str]: 生成的唯一文件名列表（顺序对应输入）
+        """
+        timestamp = time.strftime(_FILENAME_TIMESTAMP_FORMAT)
+        filenames = []
+        for original_name in original_names:
+            extension = os.path.splitext(original_name)[1].lower() or '.bin'
+            filenames.append(
+                f"IMG_{timestamp}_{next(_filename_counter):06x}_{secrets.token_hex(2)}{extension}"
+            )
+        return filenames
 
 class StorageManager:
     """
@@ -169,6 +208,14 @@ class StorageManager:
     - 容量限制管理
     """
 
+    # 增量清理时每处理多少条目让出一次事件循环
+    CLEANUP_YIELD_INTERVAL = 256
+
+    # 附件文件名前缀。扫描时用C实现的str.startswith过滤即可。
+    # 本模块完全是I/O密集型、无数值内层循环，
+    # Numba/SIMD等JIT手段在此处刻意不采用。
+    IMG_PREFIX = 'IMG_'
+
     def __init__(self, config_dir: Path):
         """
         存储管理器的初始化
@@ -178,6 +225,8 @@ class StorageManager:
         """
         self.config_dir = config_dir
         self.attachments_dir = config_dir / 'attachments'
+        # 热路径用的字符串形式（避免每个附件的Path构造）
+        self._attachments_dir_str = str(self.attachments_dir)
         self.ensure_storage_directory()
 
     def ensure_storage_directory(self):
@@ -196,16 +245,19 @@ class StorageManager:
             logger.error(f"Failed to create storage directory: {e}")
             raise
 
-    def get_storage_path(self, filename: str) -> Path:
+    def get_storage_path(self, filename: str) -> str:
         """
         获取文件保存路径
 
+        返回字符串路径：open/os.chmod/aiofiles都直接接受str，
+        热路径上无需Path对象的解析开销。
+
         扩展点：
         - 目录分层化（按日期等）
         - 负载均衡目录选择
         - 重复文件处理
         """
-        return self.attachments_dir / filename
+        return os.path.join(self._attachments_dir_str, filename)
 
     def cleanup_old_files(self, max_age_days: int = 1) -> int:
         """
@@ -226,22 +278,78 @@ class StorageManager:
             return 0
 
         try:
-            cutoff_time = datetime.now() - timedelta(days=max_age_days)
+            # 直接比较float时间戳，省去每个条目的datetime构造
+            cutoff_time = (datetime.now() - timedelta(days=max_age_days)).timestamp()
             deleted_count = 0
 
-            for file_path in self.attachments_dir.glob('IMG_*'):
-                try:
-                    # ファイルの更新時刻を取得
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
+            # scandir的DirEntry可复用readdir时缓存的stat信息，
+            # 相比glob+Path.stat减少每个文件一次系统调用
+            with os.scandir(self.attachments_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith(self.IMG_PREFIX):
+                        continue
+                    try:
+                        if entry.stat().st_mtime < cutoff_time:
+                            os.unlink(entry.path)
+                            deleted_count += 1
+                            logger.info(f"Deleted old attachment: {entry.name}")
+
+                    except OSError as e:
+                        logger.warning(f"Failed to delete {entry.name}: {e}")
+                        continue
 
-                    if file_mtime < cutoff_time:
-                        file_path.unlink()
-                        deleted_count += 1
-                        logger.info(f"Deleted old attachment: {file_path.name}")
+            if deleted_count > 0:
+                logger.info(f"Cleanup completed: {deleted_count} files deleted")
 
-                except OSError as e:
-                    logger.warning(f"Failed to delete {file_path.name}: {e}")
-                    continue
+            return deleted_count
+
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
+            return 0
+
+    async def cleanup_old_files_async(self, max_age_days: int = 1) -> int:
+        """
+        旧文件的增量清理（事件循环协作版）
+
+        每处理CLEANUP_YIELD_INTERVAL个条目就让出一次事件循环，
+        即使附件目录有数千个文件，Bot也能在清理期间继续处理消息。
+
+        扩展点：
+        - 详细的删除策略
+        - 归档功能
+        - 删除前通知
+
+        Args:
+            max_age_days: 保留期间（天数）
+
+        Returns:
+            int: 删除的文件数
+        """
+        if not self.attachments_dir.exists():
+            return 0
+
+        try:
+            cutoff_time = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+            deleted_count = 0
+            processed = 0
+
+            with os.scandir(self.attachments_dir) as entries:
+                for entry in entries:
+                    processed += 1
+                    if processed % self.CLEANUP_YIELD_INTERVAL == 0:
+                        await asyncio.sleep(0)
+
+                    if not entry.name.startswith(self.IMG_PREFIX):
+                        continue
+                    try:
+                        if entry.stat().st_mtime < cutoff_time:
+                            os.unlink(entry.path)
+                            deleted_count += 1
+                            logger.info(f"Deleted old attachment: {entry.name}")
+
+                    except OSError as e:
+                        logger.warning(f"Failed to delete {entry.name}: {e}")
+                        continue
 
             if deleted_count > 0:
                 logger.info(f"Cleanup completed: {deleted_count} files deleted")
@@ -270,11 +378,18 @@ class StorageManager:
                     'directory': str(self.attachments_dir)
                 }
 
-            files = list(self.attachments_dir.glob('IMG_*'))
-            total_size = sum(f.stat().st_size for f in files if f.is_file())
+            total_files = 0
+            total_size = 0
+            with os.scandir(self.attachments_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith(self.IMG_PREFIX):
+                        continue
+                    total_files += 1
+                    if entry.is_file():
+                        total_size += entry.stat().st_size
 
             return {
-                'total_files': len(files),
+                'total_files': total_files,
                 'total_size': total_size,
                 'total_size_mb': round(total_size / 1024 / 1024, 2),
                 'directory': str(self.attachments_dir),
@@ -305,6 +420,10 @@ class AttachmentDownloader:
     # 可配置常量（将来可配置文件化）
     DOWNLOAD_TIMEOUT_SECONDS = 30
     MAX_CONCURRENT_DOWNLOADS = 5
+    KEEPALIVE_TIMEOUT_SECONDS = 30
+    DNS_CACHE_TTL_SECONDS = 300
+    # 64KB：比io.DEFAULT_BUFFER_SIZE更适合现代硬件的分块大小
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, storage_manager: StorageManager):
         """
@@ -317,7 +436,41 @@ class AttachmentDownloader:
         self.file_validator = FileValidator()
         self.naming_strategy = FileNamingStrategy()
 
-    async def download_attachment(self, attachment) -> Optional[FileMetadata]:
+        # 共享HTTP会话（延迟初始化，复用keep-alive连接与DNS缓存）
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取共享的aiohttp会话（仅首次调用时创建）
+
+        Discord CDN的附件大多来自同一主机，
+        复用单一会话可避免每次下载的TCP/TLS握手与DNS查询。
+
+        扩展点：
+        - 代理设置
+        - 自定义请求头
+        """
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(
+                        limit=self.MAX_CONCURRENT_DOWNLOADS,
+                        limit_per_host=self.MAX_CONCURRENT_DOWNLOADS,
+                        keepalive_timeout=self.KEEPALIVE_TIMEOUT_SECONDS,
+                        ttl_dns_cache=self.DNS_CACHE_TTL_SECONDS
+                    )
+                    timeout = aiohttp.ClientTimeout(total=self.DOWNLOAD_TIMEOUT_SECONDS)
+                    self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        """关闭共享HTTP会话并释放连接资源"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def download_attachment(self, attachment, saved_filename: Optional[str] = None) -> Optional[FileMetadata]:
         """
         Discord附件文件的异步下载
 
@@ -328,6 +481,7 @@ class AttachmentDownloader:
 
         Args:
             attachment: Discord attachment object
+            saved_filename: 预先生成的保存文件名（批处理时传入，省略时单独生成）
 
         Returns:
             Optional[FileMetadata]: 下载成功时的元数据
@@ -339,33 +493,36 @@ class AttachmentDownloader:
                 logger.warning(f"Invalid attachment {attachment.filename}: {error_msg}")
                 return None
 
-            # ステップ2: ファイル名生成
-            saved_filename = self.naming_strategy.generate_unique_filename(attachment.filename)
+            # ステップ2: ファイル名決定（バッチ処理では事前生成済み）
+            if saved_filename is None:
+                saved_filename = self.naming_strategy.generate_unique_filename(attachment.filename)
             file_path = self.storage_manager.get_storage_path(saved_filename)
 
             # ステップ3: ダウンロード実行
-            success = await self._perform_download(attachment.url, file_path)
-            if not success:
+            written = await self._perform_download(attachment.url, file_path)
+            if written is None:
                 return None
 
             # ステップ4: メタデータ作成
+            # sizeには実際に書き込んだバイト数を使う
+            # （Discordのメタデータは稀に古いサイズを報告する）
             metadata = FileMetadata(
                 original_name=attachment.filename,
                 saved_name=saved_filename,
-                file_path=str(file_path.absolute()),
-                size=attachment.size,
+                file_path=os.path.abspath(file_path),
+                size=written,
                 download_url=attachment.url,
                 timestamp=datetime.now().isoformat()
             )
 
-            logger.info(f"Downloaded attachment: {saved_filename} ({attachment.size} bytes)")
+            logger.info(f"Downloaded attachment: {saved_filename} ({written} bytes)")
             return metadata
 
         except Exception as e:
             logger.error(f"Error downloading {attachment.filename}: {e}")
             return None
 
-    async def _perform_download(self, url: str, file_path: Path) -> bool:
+    async def _perform_download(self, url: str, file_path: str) -> Optional[int]:
         """
         实际的下载处理
 
@@ -373,32 +530,52 @@ class AttachmentDownloader:
         - 分块单位下载
         - 恢复功能
         - 进度通知
+
+        Returns:
+            Optional[int]: 成功时为实际写入的字节数，失败时为None
         """
         try:
-            timeout = aiohttp.ClientTimeout(total=self.DOWNLOAD_TIMEOUT_SECONDS)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        content = await response.read()
-
-                        # ファイル保存
-                        with open(file_path, 'wb') as f:
-                            f.write(content)
-
-                        # 権限設定（読み取り専用）
-                        os.chmod(file_path, 0o644)
-
-                        return True
-                    else:
-                        logger.error(f"HTTP {response.status} for URL: {url}")
-                        return False
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.error(f"HTTP {response.status} for URL: {url}")
+                    return None
+
+                # Content-Length预检：超限时不读取响应体直接中止
+                content_length = int(response.headers.get('Content-Length', 0))
+                if content_length > FileValidator.MAX_FILE_SIZE:
+                    logger.warning(
+                        f"Aborted oversized download ({content_length} bytes, "
+                        f"max {FileValidator.MAX_FILE_SIZE}): {url}"
+                    )
+                    return None
+
+                # 分块流式写入（内存占用上限为单个分块大小）
+                # 同时统计已写入字节数，防御无Content-Length的分块响应超限
+                written = 0
+                async with aiofiles.open(file_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > FileValidator.MAX_FILE_SIZE:
+                            logger.warning(f"Download exceeded size limit mid-stream: {url}")
+                            break
+                        await f.write(chunk)
+
+                if written > FileValidator.MAX_FILE_SIZE:
+                    os.unlink(file_path)
+                    return None
+
+                # 権限設定（読み取り専用）。同期chmod系统调用也移出事件循环
+                await aio_os.chmod(file_path, 0o644)
+
+                return written
 
         except asyncio.TimeoutError:
             logger.error(f"Download timeout for URL: {url}")
-            return False
+            return None
         except Exception as e:
             logger.error(f"Download error for URL {url}: {e}")
-            return False
+            return None
 
 class AttachmentManager:
     """
@@ -418,14 +595,21 @@ class AttachmentManager:
     - 备份·同步功能
     """
 
-    def __init__(self):
+    def __init__(self, settings: Optional[SettingsManager] = None):
         """
         附件文件管理器的初始化
+
+        Args:
+            settings: 既存的设置管理实例（省略时自行创建）。
+                      注入共享实例可避免重复读取配置文件。
         """
-        self.settings = SettingsManager()
+        self.settings = settings if settings is not None else SettingsManager()
         self.storage_manager = StorageManager(self.settings.config_dir)
         self.downloader = AttachmentDownloader(self.storage_manager)
 
+        # 下载并发上限（延迟创建：构造时事件循环尚未运行）
+        self._download_sem: Optional[asyncio.Semaphore] = None
+
     async def process_attachments(self, attachments) -> List[str]:
         """
         多个附件文件的并行处理
@@ -446,8 +630,19 @@ class AttachmentManager:
 
         logger.info(f"Processing {len(attachments)} attachment(s)")
 
-        # 並列ダウンロード実行
-        tasks = [self.downloader.download_attachment(attachment) for attachment in attachments]
+        if self._download_sem is None:
+            self._download_sem = asyncio.Semaphore(AttachmentDownloader.MAX_CONCURRENT_DOWNLOADS)
+
+        # ファイル名を一括事前生成（タスク内の逐次処理を検証+HTTPに縮小）
+        saved_filenames = FileNamingStrategy.generate_batch_filenames(
+            [attachment.filename for attachment in attachments]
+        )
+
+        # 並列ダウンロード実行（セマフォで同時実行数を制限）
+        tasks = [
+            self._download_with_limit(attachment, saved_filename)
+            for attachment, saved_filename in zip(attachments, saved_filenames)
+        ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # 結果の処理
@@ -469,9 +664,27 @@ class AttachmentManager:
 
         return successful_paths
 
+    async def _download_with_limit(self, attachment, saved_filename: str) -> Optional[FileMetadata]:
+        """
+        受并发上限约束的单个下载
+
+        多条消息同时带附件到达时，总并发数也不会超过
+        MAX_CONCURRENT_DOWNLOADS，避免文件描述符暴涨。
+        """
+        async with self._download_sem:
+            return await self.downloader.download_attachment(attachment, saved_filename)
+
+    async def close(self):
+        """
+        释放下载器持有的网络资源
+
+        Bot关闭时调用，确保共享HTTP会话被正确关闭。
+        """
+        await self.downloader.close()
+
     def cleanup_old_files(self, max_age_days: int = 1) -> int:
         """
-        旧文件的清理（同步包装器）
+        旧文件的清理（同步包装器，CLI用）
 
         Args:
             max_age_days: 保留期间（天数）
@@ -481,15 +694,39 @@ class AttachmentManager:
         """
         return self.storage_manager.cleanup_old_files(max_age_days)
 
+    async def cleanup_old_files_async(self, max_age_days: int = 1) -> int:
+        """
+        旧文件的清理（事件循环用）
+
+        增量扫描并定期让出事件循环，清理期间消息处理不受阻塞。
+
+        Args:
+            max_age_days: 保留期间（天数）
+
+        Returns:
+            int: 删除的文件数
+        """
+        return await self.storage_manager.cleanup_old_files_async(max_age_days)
+
     def get_storage_info(self) -> Dict[str, Any]:
         """
-        存储信息的获取（同步包装器）
+        存储信息的获取（同步包装器，CLI用）
 
         Returns:
             Dict[str, Any]: 存储使用情况
         """
         return self.storage_manager.get_storage_info()
 
+    async def get_storage_info_async(self) -> Dict[str, Any]:
+        """
+        存储信息的获取（事件循环用）
+
+        Returns:
+            Dict[str, Any]: 存储使用情况
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.storage_manager.get_storage_info)
+
 # 测试·调试用函数
 async def test_attachment_manager():
     """
@@ -22,12 +22,13 @@ import sys
 import json
 import asyncio
 import logging
-import requests
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
-# 添加包根目录（相对导入支持）
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加包根目录（相对导入支持，避免重复插入导致sys.path膨胀）
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 try:
     import discord
@@ -36,6 +37,22 @@ except ImportError:
     print("Error: discord.py is not installed. Run: pip install discord.py")
     sys.exit(1)
 
+try:
+    import aiohttp
+except ImportError:
+    print("Error: aiohttp is not installed. Run: pip install aiohttp")
+    sys.exit(1)
+
+# orjson为可选的高速JSON序列化器（无则回退到标准库）
+try:
+    import orjson
+
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data)
+except ImportError:
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
 from config.settings import SettingsManager
 from attachment_manager import AttachmentManager
 
@@ -109,6 +126,9 @@ class ClaudeCLIBot(commands.Bot):
     # 可配置常量（将来可配置文件化）
     CLEANUP_INTERVAL_HOURS = 6
     REQUEST_TIMEOUT_SECONDS = 5
+    # 快路径等待时间：处理在此时间内完成则跳过加载提示，
+    # 将Discord API调用从2次（发送+编辑）减为1次
+    FAST_PATH_TIMEOUT_SECONDS = 1.5
     LOADING_MESSAGE = "`...`"
     SUCCESS_MESSAGE = "> 消息发送完成"
 
@@ -120,15 +140,43 @@ class ClaudeCLIBot(commands.Bot):
             settings_manager: 设置管理实例
         """
         self.settings = settings_manager
-        self.attachment_manager = AttachmentManager()
+        self.attachment_manager = AttachmentManager(settings=self.settings)
         self.message_processor = MessageProcessor()
 
+        # Flask转发用HTTP会话（延迟初始化，在事件循环内创建）
+        self._http: Optional[aiohttp.ClientSession] = None
+
+        # 频道ID→会话编号的快照缓存（每条消息O(1)查找，免去配置重读）
+        self._channel_session_cache: Dict[str, int] = {}
+        self._sessions_mtime_ns: Optional[int] = None
+        self.refresh_session_cache()
+
         # Discord Bot设置
         intents = discord.Intents.default()
         intents.message_content = True  # 消息内容的访问权限
 
         super().__init__(command_prefix='!', intents=intents)
 
+    def refresh_session_cache(self):
+        """
+        按需重建频道→会话的快照缓存
+
+        与Flask侧相同的mtime校验模式：每次仅对sessions.json做
+        一次stat()，文件实际变更时才重新解析。`vai add-session`
+        等外部修改因此在运行中的Bot上即时生效，
+        常规路径则不付出重读解析的代价。
+        """
+        try:
+            mtime_ns = os.stat(self.settings.sessions_file).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns == self._sessions_mtime_ns:
+            return
+        self._channel_session_cache = {
+            channel_id: num for num, channel_id in self.settings.list_sessions()
+        }
+        self._sessions_mtime_ns = mtime_ns
+
     async def on_ready(self):
         """
         Bot准备完成时的初始化处理
@@ -157,7 +205,7 @@ class ClaudeCLIBot(commands.Bot):
         - 日志文件的轮转
         - 缓存的初始化
         """
-        cleanup_count = self.attachment_manager.cleanup_old_files()
+        cleanup_count = await self.attachment_manager.cleanup_old_files_async()
         if cleanup_count > 0:
             print(f'🧹 Cleaned up {cleanup_count} old attachment files')
 
@@ -174,6 +222,19 @@ class ClaudeCLIBot(commands.Bot):
             self.cleanup_task.start()
             print(f'⏰ Attachment cleanup task started (runs every {self.CLEANUP_INTERVAL_HOURS} hours)')
 
+    async def close(self):
+        """
+        Bot关闭时的资源清理
+
+        扩展点：
+        - 数据库连接的关闭
+        - 统计信息的持久化
+        """
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        await self.attachment_manager.close()
+        await super().close()
+
     async def on_message(self, message):
         """
         消息接收时的主要处理处理器
@@ -198,26 +259,41 @@ class ClaudeCLIBot(commands.Bot):
         if not await self._validate_message(message):
             return
 
-        # 会话确认
-        session_num = self.settings.channel_to_session(str(message.channel.id))
+        # 会话确认（快照缓存的O(1)查找，mtime校验保证外部修改可见）
+        # snowflake→str转换只做一次，转发payload复用同一字符串
+        self.refresh_session_cache()
+        channel_id_str = str(message.channel.id)
+        session_num = self._channel_session_cache.get(channel_id_str)
         if session_num is None:
             return
 
-        # 用户反馈（即时加载显示）
-        loading_msg = await self._send_loading_feedback(message.channel)
-        if not loading_msg:
-            return
+        # 消息处理管道（快路径：短时间内完成则不发送加载提示）
+        pipeline_task = asyncio.create_task(
+            self._process_message_pipeline(message, session_num, channel_id_str)
+        )
 
+        loading_msg = None
         try:
-            # 消息处理管道
-            result_text = await self._process_message_pipeline(message, session_num)
-
+            result_text = await asyncio.wait_for(
+                asyncio.shield(pipeline_task), self.FAST_PATH_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            # 慢路径：先给出加载反馈，处理完成后编辑
+            loading_msg = await self._send_loading_feedback(message.channel)
+            try:
+                result_text = await pipeline_task
+            except Exception as e:
+                result_text = f"❌ 处理错误: {str(e)[:100]}"
+                logger.error(f"Message processing error: {e}", exc_info=True)
         except Exception as e:
             result_text = f"❌ 处理错误: {str(e)[:100]}"
             logger.error(f"Message processing error: {e}", exc_info=True)
 
-        # 最终结果的显示
-        await self._update_feedback(loading_msg, result_text)
+        # 最終結果の表示（遅いパスは編集、速いパスは直接送信）
+        if loading_msg:
+            await self._update_feedback(loading_msg, result_text)
+        else:
+            await self._send_result(message.channel, result_text)
 
     async def _validate_message(self, message) -> bool:
         """
@@ -252,7 +328,16 @@ class ClaudeCLIBot(commands.Bot):
             logger.error(f'反馈发送错误: {e}')
             return None
 
-    async def _process_message_pipeline(self, message, session_num: int) -> str:
+    async def _send_result(self, channel, result_text: str):
+        """
+        处理结果的直接发送（快路径用，单次API调用）
+        """
+        try:
+            await channel.send(result_text)
+        except Exception as e:
+            logger.error(f'结果发送错误: {e}')
+
+    async def _process_message_pipeline(self, message, session_num: int, channel_id_str: str) -> str:
         """
         消息处理管道
 
@@ -270,7 +355,7 @@ class ClaudeCLIBot(commands.Bot):
         )
 
         # 步骤3: 向Claude Code转发
-        return await self._forward_to_claude(formatted_message, message, session_num)
+        return await self._forward_to_claude(formatted_message, message, session_num, channel_id_str)
 
     async def _process_attachments(self, message, session_num: int) -> List[str]:
         """
@@ -292,7 +377,8 @@ class ClaudeCLIBot(commands.Bot):
 
         return attachment_paths
 
-    async def _forward_to_claude(self, formatted_message: str, original_message, session_num: int) -> str:
+    async def _forward_to_claude(self, formatted_message: str, original_message, session_num: int,
+                                 channel_id_str: str) -> str:
         """
         向Claude Code的消息转发
 
@@ -304,38 +390,66 @@ class ClaudeCLIBot(commands.Bot):
         try:
             payload = {
                 'message': formatted_message,
-                'channel_id': str(original_message.channel.id),
+                'channel_id': channel_id_str,
                 'session': session_num,
                 'user_id': str(original_message.author.id),
                 'username': str(original_message.author)
             }
 
             flask_port = self.settings.get_port('flask')
-            response = requests.post(
+            session = self._get_http_session()
+            async with session.post(
                 f'http://localhost:{flask_port}/discord-message',
-                json=payload,
-                timeout=self.REQUEST_TIMEOUT_SECONDS
-            )
-
-            return self._format_response_status(response.status_code)
+                data=_json_dumps(payload),
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                return self._format_response_status(response.status)
 
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectorError:
             logger.error("Failed to connect to Flask app. Is it running?")
             return "❌ 错误: 无法连接到Flask app"
         except Exception as e:
             logger.error(f"Error forwarding message: {e}")
             return f"❌ 错误: {str(e)[:100]}"
 
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """
+        获取Flask转发用的共享HTTP会话（仅首次调用时创建）
+
+        异步请求使Discord心跳在转发期间不被阻塞，
+        多条消息的转发可以并行进行。
+
+        连接器按长连接配置：到本地Flask的TCP连接跨消息复用，
+        省去每条消息的握手开销（Flask侧threaded=True时
+        支持HTTP/1.1 keep-alive）。
+        """
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT_SECONDS),
+                connector=aiohttp.TCPConnector(
+                    limit=32,
+                    limit_per_host=16,
+                    keepalive_timeout=120,
+                    enable_cleanup_closed=True
+                )
+            )
+        return self._http
+
     def _format_response_status(self, status_code: int) -> str:
         """
         响应状态的格式化
 
+        Flask侧采用后台转发队列后，正常受理返回202（入队受理）；
+        此处的"成功"指桥接已受理转发，tmux层面的失败由Flask侧
+        记录在/jobs/<job_id>中。
+
         扩展点：
         - 详细状态消息
+        - /jobs/<job_id>的轮询与失败反馈
         - 多语言支持
         - 自定义消息
         """
-        if status_code == 200:
+        if status_code in (200, 202):
             return self.SUCCESS_MESSAGE
         else:
             return f"⚠️ 状态: {status_code}"
@@ -366,7 +480,7 @@ class ClaudeCLIBot(commands.Bot):
         - 系统健康检查
         """
         try:
-            cleanup_count = self.attachment_manager.cleanup_old_files()
+            cleanup_count = await self.attachment_manager.cleanup_old_files_async()
             if cleanup_count > 0:
                 logger.info(f'Automatic cleanup: {cleanup_count} files deleted')
         except Exception as e:
@@ -390,6 +504,7 @@ def create_bot_commands(bot: ClaudeCLIBot, settings: SettingsManager):
     @bot.command(name='status')
     async def status_command(ctx):
         """Bot状态确认命令"""
+        bot.refresh_session_cache()
         sessions = settings.list_sessions()
         embed = discord.Embed(
             title="Claude CLI Bot Status",
@@ -405,6 +520,7 @@ def create_bot_commands(bot: ClaudeCLIBot, settings: SettingsManager):
     @bot.command(name='sessions')
     async def sessions_command(ctx):
         """已设置会话一览显示命令"""
+        bot.refresh_session_cache()
         sessions = settings.list_sessions()
         if not sessions:
             await ctx.send("No sessions configured.")
@@ -10,8 +10,10 @@ import json
 import requests
 from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加包根目录（相对导入支持，避免重复插入导致sys.path膨胀）
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from config.settings import SettingsManager
 
@@ -15,40 +15,154 @@ Flask HTTP Bridge - Discord ↔ Claude Code 集成的核心
 - 认证·权限管理的实现
 - 日志·监视功能的强化
 - 负载均衡·扩展对应
+
+关于ASGI化（Quart/aioflask + hypercorn）：
+曾作为消除tmux转发等待对工作线程占用的方案进行过评估，
+但本应用部署在WSGI（Gunicorn gthread）之上，
+阻塞点通过后台转发队列与tmux调用的批量化来消除，
+框架层面的ASGI迁移收益有限，故刻意不采用。
 """
 
 import os
 import sys
 import json
+import uuid
+import shlex
+import shutil
+import signal
 import subprocess
+import atexit
+import functools
+import queue
+import threading
 import time
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 
-# 添加包根目录（相对导入支持）
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加包根目录（相对导入支持，避免重复插入导致sys.path膨胀）
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 try:
-    from flask import Flask, request, jsonify, Response
+    from flask import Blueprint, Flask, request, Response
+    from werkzeug.exceptions import HTTPException
 except ImportError:
     print("Error: Flask is not installed. Run: pip install flask")
     sys.exit(1)
 
+# orjson为可选的高速JSON序列化器（无则回退到标准库）
+try:
+    import orjson
+
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def _json_loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
+    def _json_loads(raw: bytes) -> Any:
+        return json.loads(raw)
+
+# fastjsonschema为可选的预编译Schema验证器（无则回退到逐字段检查）
+_DISCORD_MESSAGE_SCHEMA = {
+    'type': 'object',
+    'required': ['message', 'session', 'channel_id'],
+    'properties': {
+        'message': {'type': 'string', 'maxLength': 4000},  # 遵循Discord限制的上限
+        'session': {'type': 'integer', 'minimum': 1},
+        'channel_id': {'type': 'string'},
+    },
+}
+try:
+    import fastjsonschema
+    _compiled_message_validator = fastjsonschema.compile(_DISCORD_MESSAGE_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _compiled_message_validator = None
+
 from config.settings import SettingsManager
 
+# tmux路径在模块加载时解析一次，省去每次调用的$PATH查找；
+# 绝对路径的argv也让CPython得以走posix_spawn快速路径
+TMUX_BIN = shutil.which('tmux') or 'tmux'
+
 # 日志设置（生产环境中可从外部配置文件读取）
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 请求线程只向队列投递日志记录，stdout写出由QueueListener的
+# 后台线程承担，避免多线程争抢流句柄的锁
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+
+class _PerProcessQueueHandler(QueueHandler):
+    """
+    fork后自动重启监听线程的QueueHandler
+
+    默认部署路径是Gunicorn主进程导入本模块后fork工作进程，
+    而线程不跨fork存活：导入时启动的QueueListener在工作进程内
+    不存在，日志只入队无人消费。因此监听线程按进程惰性启动，
+    每次投递前核对pid，fork后在当前进程重建队列与监听线程。
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self._listener: Optional[QueueListener] = None
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+
+    def enqueue(self, record):
+        if self._listener_pid != os.getpid():
+            with self._listener_lock:
+                if self._listener_pid != os.getpid():
+                    # fork继承的队列可能残留父进程的记录，换新队列
+                    self.queue = queue.SimpleQueue()
+                    self._listener = QueueListener(self.queue, _log_stream_handler)
+                    self._listener.start()
+                    self._listener_pid = os.getpid()
+        super().enqueue(record)
+
+logging.basicConfig(level=logging.INFO, handlers=[_PerProcessQueueHandler()])
 logger = logging.getLogger(__name__)
 
+# 秒分辨率ISO时间戳的线程局部缓存
+# （datetime构造+isoformat在高QPS下是可观的每请求开销）
+_now_iso_cache = threading.local()
+
+def _now_iso() -> str:
+    """
+    获取当前时刻的ISO格式字符串（秒分辨率、同秒内复用缓存）
+    """
+    sec = int(time.time())
+    if getattr(_now_iso_cache, 'sec', None) != sec:
+        _now_iso_cache.sec = sec
+        _now_iso_cache.value = datetime.fromtimestamp(sec).isoformat()
+    return _now_iso_cache.value
+
+def ojson(data: Any, status: int = 200) -> Response:
+    """
+    JSON响应的生成（flask.jsonify的高速替代）
+
+    直接输出bytes，省去stdlib编码器与额外的str→bytes转换。
+    """
+    return Response(_json_dumps(data), status=status, mimetype='application/json')
+
 class TmuxMessageForwarder:
     """
     tmux会话的消息转发处理
 
+    常规路径为常驻的tmux控制模式客户端（tmux -C）：
+    每条消息只需向既有管道write，无需fork+exec tmux进程。
+    管道损坏或消息含换行（控制模式按行解析）时
+    退回一次性的subprocess调用。
+
     未来的扩展：
     - tmux以外的转发方式（WebSocket、gRPC等）
     - 消息队列
@@ -59,9 +173,21 @@ class TmuxMessageForwarder:
     # 可配置常量（将来可配置文件化）
     TMUX_DELAY_SECONDS = 0.2
     SESSION_NAME_PREFIX = "claude-session"
-
-    @classmethod
-    def forward_message(cls, message: str, session_num: int) -> Tuple[bool, Optional[str]]:
+    # 控制模式客户端挂靠的专用会话名
+    CONTROL_SESSION_NAME = "claude-bridge-control"
+    # 控制模式应答的确认超时（settle等待+余量）
+    CONTROL_REPLY_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self):
+        self._control: Optional[subprocess.Popen] = None
+        self._control_lock = threading.Lock()
+        # 控制模式应答的计数与错误记录（应答与提交同序，
+        # 按计数即可将%end/%error对应回提交的命令）
+        self._reply_cond = threading.Condition()
+        self._replies_done = 0
+        self._reply_errors: Dict[int, str] = {}
+
+    def forward_message(self, message: str, session_num: int) -> Tuple[bool, Optional[str]]:
         """
         向指定会话转发消息
 
@@ -79,20 +205,22 @@ class TmuxMessageForwarder:
             Tuple[bool, Optional[str]]: (成功标志, 错误消息)
         """
         try:
-            session_name = f"{cls.SESSION_NAME_PREFIX}-{session_num}"
+            session_name = _session_name(session_num)
 
-            # 步骤1: 消息发送
-            cls._send_tmux_keys(session_name, message)
-
-            # 步骤2: Enter发送（命令执行）
-            time.sleep(cls.TMUX_DELAY_SECONDS)
-            cls._send_tmux_keys(session_name, 'C-m')
+            # 含换行的消息无法安全通过按行解析的控制模式发送
+            if '\n' not in message and self._forward_via_control(session_name, message):
+                logger.info(f"Message forwarded to session {session_num}")
+                return True, None
 
+            # 回退路径：一次性subprocess调用
+            self._forward_via_subprocess(session_name, message)
             logger.info(f"Message forwarded to session {session_num}")
             return True, None
 
         except subprocess.CalledProcessError as e:
-            error_msg = f"tmux command failed: {e}"
+            # stderr仅在错误路径读取（成功时send-keys无任何输出）
+            stderr = e.stderr.decode(errors='replace').strip() if e.stderr else ''
+            error_msg = f"tmux command failed: {stderr or e}"
             logger.error(error_msg)
             return False, error_msg
         except Exception as e:
@@ -100,22 +228,198 @@ class TmuxMessageForwarder:
             logger.error(error_msg)
             return False, error_msg
 
+    def _forward_via_control(self, session_name: str, message: str) -> bool:
+        """
+        通过常驻控制模式客户端转发（热路径）
+
+        每条消息的开销从两次fork+exec降为管道write。
+        写入后等待tmux对各命令的%end/%error应答再判定成败——
+        仅凭write成功即报成功会把"session not found"等错误
+        吞进日志，任务状态表上呈现为虚假的finished。
+
+        Returns:
+            bool: 确认送达时True，管道不可用或tmux报错时False
+            （调用方回退到subprocess路径，由其带回具体错误）
+        """
+        # 消息→settle等待→Enter以';'串联为单行命令序列：
+        # 每条消息从两次write+Python侧sleep收敛为一次write系统调用，
+        # settle等待移交tmux侧的run-shell
+        command = (
+            f"send-keys -t {session_name} -l {shlex.quote(message)} ; "
+            f"run-shell 'sleep {self.TMUX_DELAY_SECONDS}' ; "
+            f"send-keys -t {session_name} C-m\n"
+        ).encode()
+
+        with self._control_lock:
+            try:
+                self._ensure_control_client()
+                with self._reply_cond:
+                    first_reply = self._replies_done
+                stdin = self._control.stdin
+                stdin.write(command)
+                stdin.flush()
+                # 单行内的3条命令各产生一个应答块
+                return self._await_replies(first_reply, 3)
+            except (OSError, ValueError) as e:
+                # 管道损坏：丢弃客户端，下次调用时重建
+                logger.warning(f"tmux control client unavailable, falling back: {e}")
+                self._drop_control_client()
+                return False
+
+    def _await_replies(self, first_reply: int, count: int) -> bool:
+        """
+        等待指定区间的控制模式应答并判定成败
+        （调用方需持有_control_lock）
+
+        Args:
+            first_reply: 本次提交前已完成的应答数（区间起点）
+            count: 本次提交的命令数
+
+        Returns:
+            bool: 全部命令以%end完结时True
+        """
+        deadline = time.monotonic() + self.CONTROL_REPLY_TIMEOUT_SECONDS
+        reply_range = range(first_reply, first_reply + count)
+        with self._reply_cond:
+            while self._replies_done < first_reply + count:
+                # 出错即短路：tmux会中止序列中的后续命令，
+                # 剩余应答不会再来
+                if any(i in self._reply_errors for i in reply_range):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # 应答超时视为客户端异常，丢弃后由调用方回退
+                    logger.warning("tmux control reply timed out, dropping client")
+                    self._drop_control_client()
+                    return False
+                self._reply_cond.wait(remaining)
+            failed = any(self._reply_errors.pop(i, None) for i in reply_range)
+        if failed:
+            # 序列中止后应答计数不再保证对齐，重建客户端
+            self._drop_control_client()
+            return False
+        return True
+
+    def _ensure_control_client(self):
+        """
+        确保控制模式客户端存活（调用方需持有_control_lock）
+        """
+        if self._control is not None and self._control.poll() is None:
+            return
+
+        with self._reply_cond:
+            self._replies_done = 0
+            self._reply_errors.clear()
+
+        self._control = subprocess.Popen(
+            [TMUX_BIN, '-C', 'new-session', '-A', '-s', self.CONTROL_SESSION_NAME],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        # 应答解析线程：排出stdout防止管道缓冲填满，
+        # 并把%end/%error按序计数供_await_replies对应命令
+        threading.Thread(
+            target=self._drain_control_output,
+            args=(self._control,),
+            name='tmux-control-drain',
+            daemon=True
+        ).start()
+
+        # attach本身会产生一个初始应答块，先等它完结，
+        # 后续计数才能与提交的命令一一对齐
+        with self._reply_cond:
+            self._reply_cond.wait_for(
+                lambda: self._replies_done >= 1,
+                timeout=self.CONTROL_REPLY_TIMEOUT_SECONDS
+            )
+        logger.info("tmux control-mode client started")
+
+    def _drain_control_output(self, proc: subprocess.Popen):
+        """
+        控制模式应答的解析线程
+
+        应答以%begin开块、%end（成功）或%error（失败）收尾，
+        与提交的命令同序。按完结顺序计数并记录错误文本，
+        供_await_replies判定对应命令的成败。
+        """
+        block_lines: List[bytes] = []
+        for line in iter(proc.stdout.readline, b''):
+            if line.startswith(b'%begin'):
+                block_lines = []
+            elif line.startswith(b'%end'):
+                with self._reply_cond:
+                    self._replies_done += 1
+                    self._reply_cond.notify_all()
+            elif line.startswith(b'%error'):
+                error_text = b' '.join(block_lines).decode(errors='replace').strip()
+                logger.warning(f"tmux control error: {error_text or 'unknown error'}")
+                with self._reply_cond:
+                    self._reply_errors[self._replies_done] = error_text
+                    self._replies_done += 1
+                    self._reply_cond.notify_all()
+            else:
+                block_lines.append(line.strip())
+
+    def _drop_control_client(self):
+        """丢弃失效的控制模式客户端（调用方需持有_control_lock）"""
+        if self._control is not None:
+            try:
+                self._control.terminate()
+            except OSError:
+                pass
+            self._control = None
+
+    def close(self):
+        """关闭常驻控制模式客户端"""
+        with self._control_lock:
+            self._drop_control_client()
+
+    def _forward_via_subprocess(self, session_name: str, message: str):
+        """
+        一次性subprocess转发（回退路径）
+
+        消息→settle等待→Enter以一次tmux调用完成
+        （';'分隔的命令序列，省去第二次fork+exec与Python侧sleep）。
+        -l将消息作为字面字符串发送，避免被解释为键名。
+        """
+        subprocess.run(
+            [
+                TMUX_BIN,
+                'send-keys', '-t', session_name, '-l', message, ';',
+                'run-shell', f'sleep {self.TMUX_DELAY_SECONDS}', ';',
+                'send-keys', '-t', session_name, 'C-m',
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+
     @classmethod
-    def _send_tmux_keys(cls, session_name: str, keys: str):
+    def _send_tmux_keys(cls, session_name: str, *keys: str):
         """
         向tmux会话发送按键输入
 
+        接受多个按键参数，一次调用内全部发送。
+
         扩展点：
         - 发送前验证
         - 会话存在确认
         - 替代转发方式
         """
         subprocess.run(
-            ['tmux', 'send-keys', '-t', session_name, keys],
+            [TMUX_BIN, 'send-keys', '-t', session_name, *keys],
             check=True,
-            capture_output=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
         )
 
+@functools.lru_cache(maxsize=64)
+def _session_name(session_num: int) -> str:
+    """会话编号→tmux会话名（会话集合很小，缓存后免去逐次格式化）"""
+    return f"{TmuxMessageForwarder.SESSION_NAME_PREFIX}-{session_num}"
+
 class MessageValidator:
     """
     接收消息的验证处理
@@ -146,7 +450,15 @@ class MessageValidator:
         if not data:
             return False, "No data provided"
 
-        # 必须字段的确认
+        # 优先路径：预编译的Schema验证器（编译为直线代码，单次调用完成）
+        if _compiled_message_validator is not None:
+            try:
+                _compiled_message_validator(data)
+                return True, None
+            except fastjsonschema.JsonSchemaException as e:
+                return False, e.message
+
+        # 回退路径：必须字段的逐项确认
         required_fields = ['message', 'session', 'channel_id']
         for field in required_fields:
             if field not in data:
@@ -177,6 +489,11 @@ class FlaskBridgeApp:
     - WebSocket对应
     """
 
+    # 后台转发队列设置（将来可配置文件化）
+    FORWARD_WORKERS = 16
+    # 已完成任务记录的保留上限（防止长期运行下无限增长）
+    JOB_HISTORY_LIMIT = 256
+
     def __init__(self, settings_manager: SettingsManager):
         """
         Flask应用程序的初始化
@@ -188,7 +505,30 @@ class FlaskBridgeApp:
         self.app = Flask(__name__)
         self.message_forwarder = TmuxMessageForwarder()
         self.message_validator = MessageValidator()
-        self.active_processes = {}  # 扩展：活跃进程管理
+        # 活跃进程管理：写入经由_register/_unregister维护计数器，
+        # 端点侧只做一次int属性读取而非遍历共享dict
+        self.active_processes: Dict[str, Any] = {}
+        self._active_lock = threading.Lock()
+        self._active_count = 0
+        self._reap_pending = False
+
+        # 后台转发队列：tmux转发（含0.2秒的settle等待）移出请求路径，
+        # 请求线程只负责验证+入队，立即返回202
+        self._forward_pool = ThreadPoolExecutor(
+            max_workers=self.FORWARD_WORKERS, thread_name_prefix='tmux'
+        )
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
+
+        # 进程退出时先排空在途转发，再关闭tmux控制客户端
+        atexit.register(self._shutdown)
+
+        # 会话设置的缓存（mtime校验，按需重读，详见_refresh_sessions_cache）
+        self._sessions_cache: List[Tuple[int, str]] = []
+        self._default_session_cache: int = 1
+        self._sessions_mtime_ns: Optional[int] = None
+        self._sessions_cache_lock = threading.Lock()
+        self._refresh_sessions_cache()
 
         # 路由设置
         self._configure_routes()
@@ -196,6 +536,124 @@ class FlaskBridgeApp:
         # 应用程序设置
         self._configure_app()
 
+        # SIGCHLD驱动的子进程回收（替代轮询poll()）
+        self._install_sigchld_reaper()
+
+    def _refresh_sessions_cache(self):
+        """
+        按需刷新会话设置缓存
+
+        list_sessions()每次调用都要读取并解析sessions.json，
+        对读多写少的设置文件是逐请求的无谓I/O。改为每次仅做
+        一次stat()的mtime比对，只在文件实际变更时重新解析，
+        并顺带重建静态响应前缀。
+        """
+        with self._sessions_cache_lock:
+            try:
+                mtime_ns = os.stat(self.settings.sessions_file).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns is not None and mtime_ns == self._sessions_mtime_ns:
+                return
+            self._sessions_cache = self.settings.list_sessions()
+            self._default_session_cache = self.settings.get_default_session()
+            self._sessions_mtime_ns = mtime_ns
+            self._rebuild_static_responses()
+
+    def invalidate_cache(self):
+        """外部变更会话设置后强制重读缓存"""
+        self._sessions_mtime_ns = None
+        self._refresh_sessions_cache()
+
+    @property
+    def active_count(self) -> int:
+        """活跃进程数（单次int读取）"""
+        return self._active_count
+
+    def _register_process(self, key: str, process: Any):
+        """登记活跃进程并更新计数器"""
+        self._reap_if_pending()
+        with self._active_lock:
+            self.active_processes[key] = process
+            self._active_count = len(self.active_processes)
+
+    def _unregister_process(self, key: str):
+        """注销活跃进程并更新计数器"""
+        with self._active_lock:
+            self.active_processes.pop(key, None)
+            self._active_count = len(self.active_processes)
+
+    def _install_sigchld_reaper(self):
+        """
+        注册SIGCHLD处理器回收已登记的子进程
+
+        相比逐tick轮询Popen.poll()的O(N)扫描，信号驱动的回收
+        只在子进程实际退出时运行。signal模块的限制要求在主线程
+        注册；Gunicorn工作进程自带SIGCHLD处理，跳过以免干扰。
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+            return
+        signal.signal(signal.SIGCHLD, self._on_sigchld)
+
+    def _on_sigchld(self, signum, frame):
+        """
+        SIGCHLD处理器：只置标志，不做任何加锁操作
+
+        处理器内获取非重入的threading.Lock可能自死锁：
+        持锁期间再次投递SIGCHLD，重入的处理器会阻塞在
+        被打断的那次调用永远无法释放的锁上。bool赋值是
+        原子的，实际回收推迟到常规执行流的_reap_if_pending。
+        """
+        self._reap_pending = True
+
+    def _reap_if_pending(self):
+        """
+        在常规上下文中回收已退出的登记子进程
+
+        只对active_processes中的pid做waitpid(WNOHANG)——
+        用waitpid(-1)全量回收会夺走subprocess模块
+        （tmux转发等）正在等待的退出状态。
+        """
+        if not self._reap_pending:
+            return
+        self._reap_pending = False
+        with self._active_lock:
+            for key, process in list(self.active_processes.items()):
+                pid = getattr(process, 'pid', None)
+                if pid is None:
+                    continue
+                try:
+                    reaped, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    reaped = pid
+                if reaped:
+                    self.active_processes.pop(key, None)
+            self._active_count = len(self.active_processes)
+
+    def _rebuild_static_responses(self):
+        """
+        预构建/health与/status响应的静态部分
+
+        status、version、configured_sessions等字段只在设置变更时
+        才会改变，逐请求重新构造dict并序列化是纯粹的浪费。
+        末尾的[:-1]去掉闭合的'}'，请求时只拼接动态字段。
+        """
+        sessions_count = len(self._sessions_cache)
+        self._health_prefix = _json_dumps({
+            'status': 'healthy',
+            'version': '1.0.0',  # 拡張：バージョン管理
+            'configured_sessions': sessions_count
+        })[:-1]
+        self._status_prefix = _json_dumps({
+            'status': 'running',
+            'configured': self.settings.is_configured(),
+            'sessions_count': sessions_count,
+            'version': '1.0.0'
+        })[:-1]
+
+
     def _configure_app(self):
         """
         Flask应用程序的设置
@@ -208,6 +666,24 @@ class FlaskBridgeApp:
         # 本番環境設定
         self.app.config['DEBUG'] = False
         self.app.config['TESTING'] = False
+        # 请求体上限：4000字符消息以UTF-8最多约12KB
+        # （CJK为主要使用场景，每字符3字节），加上信封取16KB。
+        # 超限由Werkzeug在读取body前即返回413，防止超大载荷
+        # 先被完整缓冲·解析后才在验证阶段被拒
+        self.app.config['MAX_CONTENT_LENGTH'] = 16 * 1024
+
+        # 超限载荷的JSON响应
+        @self.app.errorhandler(413)
+        def handle_payload_too_large(e):
+            return ojson({'error': 'Payload too large'}, 413)
+
+        # 意外异常的统一处理（HTTPException保持原样，404等照常返回）
+        @self.app.errorhandler(Exception)
+        def handle_unexpected_error(e):
+            if isinstance(e, HTTPException):
+                return e
+            logger.error(f"Unexpected error in request handling: {e}", exc_info=True)
+            return ojson({'error': 'Internal server error'}, 500)
 
     def _configure_routes(self):
         """
@@ -218,17 +694,32 @@ class FlaskBridgeApp:
         - API版本管理
         - 基于权限的路由
         """
+        # 全部端点集中到单一Blueprint，显式endpoint名
+        # 让Werkzeug的路由表按哈希直查
+        bp = Blueprint('bridge', __name__)
+
         # 健康检查端点
-        self.app.route('/health', methods=['GET'])(self.health_check)
+        bp.add_url_rule('/health', 'health', self.health_check, methods=['GET'])
 
         # 消息处理端点
-        self.app.route('/discord-message', methods=['POST'])(self.handle_discord_message)
+        bp.add_url_rule(
+            '/discord-message', 'discord_message',
+            self.handle_discord_message, methods=['POST']
+        )
 
         # 会话管理端点
-        self.app.route('/sessions', methods=['GET'])(self.get_sessions)
+        bp.add_url_rule('/sessions', 'sessions', self.get_sessions, methods=['GET'])
 
         # 状态确认端点
-        self.app.route('/status', methods=['GET'])(self.get_status)
+        bp.add_url_rule('/status', 'status', self.get_status, methods=['GET'])
+
+        # 转发任务状态确认端点
+        bp.add_url_rule('/jobs/<job_id>', 'job', self.get_job, methods=['GET'])
+
+        # 转发队列深度确认端点（可观测性）
+        bp.add_url_rule('/queue-depth', 'queue_depth', self.get_queue_depth, methods=['GET'])
+
+        self.app.register_blueprint(bp)
 
     def health_check(self) -> Response:
         """
@@ -239,15 +730,13 @@ class FlaskBridgeApp:
         - 详细健康信息
         - 警报功能
         """
-        health_data = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'version': '1.0.0',  # 拡張：バージョン管理
-            'active_sessions': len(self.active_processes),
-            'configured_sessions': len(self.settings.list_sessions())
-        }
-
-        return jsonify(health_data)
+        self._refresh_sessions_cache()
+        self._reap_if_pending()
+        suffix = (
+            f',"active_sessions":{self._active_count}'
+            f',"timestamp":"{_now_iso()}"}}'
+        ).encode()
+        return Response(self._health_prefix + suffix, mimetype='application/json')
 
     def handle_discord_message(self) -> Response:
         """
@@ -265,36 +754,138 @@ class FlaskBridgeApp:
         - 优先级控制
         - 统计信息收集
         """
-        try:
-            # 步骤1: 数据验证
-            data = request.json
-            is_valid, error_msg = self.message_validator.validate_discord_message(data)
-            if not is_valid:
-                logger.warning(f"Invalid message data: {error_msg}")
-                return jsonify({'error': error_msg}), 400
+        # 意外异常交由应用级errorhandler统一处理（见_configure_app），
+        # 热路径不再背负try/except包装
 
-            # 步骤2: 消息详细信息提取
-            message_info = self._extract_message_info(data)
+        # 步骤1: 数据验证
+        # 绕过Flask的get_json（stdlib解码+字符集嗅探），直接以bytes解析
+        raw = request.get_data(cache=False)
+        try:
+            data = _json_loads(raw) if raw else None
+        except ValueError:
+            logger.warning("Invalid JSON in request body")
+            return ojson({'error': 'Invalid JSON'}, 400)
+        is_valid, error_msg = self.message_validator.validate_discord_message(data)
+        if not is_valid:
+            logger.warning(f"Invalid message data: {error_msg}")
+            return ojson({'error': error_msg}, 400)
+
+        # 步骤2: 消息详细信息提取
+        message_info = self._extract_message_info(data)
+
+        # 步骤3: 日志记录
+        self._log_message_info(message_info)
+
+        # 步骤4: 转发任务入队（后台执行，不阻塞请求线程）
+        job_id = self._enqueue_forward(message_info)
+
+        # 步骤5: 受理响应（202 Accepted）
+        return ojson({
+            'status': 'queued',
+            'job_id': job_id,
+            'session': message_info['session_num'],
+            'message_length': len(message_info['message']),
+            'timestamp': _now_iso()
+        }, 202)
+
+    def _enqueue_forward(self, message_info: Dict[str, Any]) -> str:
+        """
+        转发任务的入队
 
-            # 步骤3: 日志记录
-            self._log_message_info(message_info)
+        采用进程内ThreadPoolExecutor而非RQ/Celery：
+        转发目标是本机tmux，引入Redis等外部队列对
+        localhost桥接而言过重。
 
-            # 步骤4: 向Claude Code的转发
-            success, error_msg = self._forward_to_claude(message_info)
-            if not success:
-                return jsonify({'error': error_msg}), 500
+        扩展点：
+        - 外部任务队列（RQ/Celery）替换
+        - 优先级队列
+        - 失败重试
 
-            # 步骤5: 成功响应
-            return jsonify({
-                'status': 'received',
+        Returns:
+            str: 任务ID（/jobs/<id>で照会可能）
+        """
+        job_id = uuid.uuid4().hex
+        with self._jobs_lock:
+            self._jobs[job_id] = {
+                'status': 'queued',
                 'session': message_info['session_num'],
-                'message_length': len(message_info['message']),
-                'timestamp': datetime.now().isoformat()
-            })
+                'error': None
+            }
+            self._prune_jobs_locked()
+
+        self._forward_pool.submit(self._run_forward_job, job_id, message_info)
+        return job_id
 
+    def _run_forward_job(self, job_id: str, message_info: Dict[str, Any]):
+        """
+        后台转发任务的执行（worker线程内）
+        """
+        with self._jobs_lock:
+            self._jobs[job_id]['status'] = 'running'
+
+        try:
+            success, error_msg = self._forward_to_claude(message_info)
         except Exception as e:
-            logger.error(f"Unexpected error in message handling: {e}", exc_info=True)
-            return jsonify({'error': 'Internal server error'}), 500
+            logger.error(f"Forward job {job_id} crashed: {e}", exc_info=True)
+            success, error_msg = False, str(e)
+
+        with self._jobs_lock:
+            self._jobs[job_id]['status'] = 'finished' if success else 'failed'
+            self._jobs[job_id]['error'] = error_msg
+
+    def _prune_jobs_locked(self):
+        """
+        任务记录的修剪（调用方需持有_jobs_lock）
+
+        超过保留上限时，从最旧的已完成任务开始删除。
+        """
+        if len(self._jobs) <= self.JOB_HISTORY_LIMIT:
+            return
+        excess = len(self._jobs) - self.JOB_HISTORY_LIMIT
+        for job_id in [
+            jid for jid, job in self._jobs.items()
+            if job['status'] in ('finished', 'failed')
+        ][:excess]:
+            del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Response:
+        """
+        转发任务状态的照会
+
+        注意：任务表为进程内状态，多工作进程部署下照会
+        需命中受理该任务的工作进程（详见create_app的说明）。
+
+        扩展点：
+        - 任务表的外部存储化（跨工作进程照会）
+        - 任务结果的详细信息
+        - 任务一览端点
+        """
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return ojson({'error': 'Job not found'}, 404)
+            return ojson({'job_id': job_id, **job})
+
+    def get_queue_depth(self) -> Response:
+        """
+        获取转发队列的积压深度
+
+        注意：多工作进程部署下只反映应答请求的那个工作进程
+        的队列（详见create_app的说明）。
+
+        扩展点：
+        - 指标导出（Prometheus等，多进程用MultiProcessCollector）
+        - 队列水位告警
+        """
+        return ojson({
+            'queue_depth': self._forward_pool._work_queue.qsize(),
+            'workers': self.FORWARD_WORKERS
+        })
+
+    def _shutdown(self):
+        """进程退出时排空转发队列并关闭tmux控制客户端"""
+        self._forward_pool.shutdown(wait=True)
+        self.message_forwarder.close()
 
     def _extract_message_info(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -311,7 +902,7 @@ class FlaskBridgeApp:
             'session_num': data.get('session', 1),
             'user_id': data.get('user_id', ''),
             'username': data.get('username', 'Unknown'),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _now_iso()
         }
 
     def _log_message_info(self, message_info: Dict[str, Any]):
@@ -323,12 +914,19 @@ class FlaskBridgeApp:
         - 外部日志系统集成
         - 指标收集
         """
+        # 日志级别未启用时连预览字符串的构造都跳过
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         session_num = message_info['session_num']
         username = message_info['username']
-        message_preview = message_info['message'][:100] + "..." if len(message_info['message']) > 100 else message_info['message']
+        message = message_info['message']
+        message_preview = message[:100] + "..." if len(message) > 100 else message
 
-        print(f"[Session {session_num}] {username}: {message_preview}")
-        logger.info(f"Message processed: session={session_num}, user={username}, length={len(message_info['message'])}")
+        logger.info(
+            f"Message processed: session={session_num}, user={username}, "
+            f"length={len(message)}, preview={message_preview}"
+        )
 
     def _forward_to_claude(self, message_info: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """
@@ -344,10 +942,8 @@ class FlaskBridgeApp:
 
         success, error_msg = self.message_forwarder.forward_message(message, session_num)
 
-        if success:
-            print(f"✅ Forwarded to Claude session {session_num}")
-        else:
-            print(f"❌ Failed to forward to Claude session {session_num}: {error_msg}")
+        if not success:
+            logger.error(f"Failed to forward to Claude session {session_num}: {error_msg}")
 
         return success, error_msg
 
@@ -360,7 +956,8 @@ class FlaskBridgeApp:
         - 会话状态确认
         - 过滤功能
         """
-        sessions = self.settings.list_sessions()
+        self._refresh_sessions_cache()
+        sessions = self._sessions_cache
         response_data = {
             'sessions': [
                 {
@@ -370,11 +967,11 @@ class FlaskBridgeApp:
                 }
                 for num, ch_id in sessions
             ],
-            'default': self.settings.get_default_session(),
+            'default': self._default_session_cache,
             'total_count': len(sessions)
         }
 
-        return jsonify(response_data)
+        return ojson(response_data)
 
     def get_status(self) -> Response:
         """
@@ -385,34 +982,85 @@ class FlaskBridgeApp:
         - 性能指标
         - 依赖服务状态
         """
-        status_data = {
-            'status': 'running',
-            'configured': self.settings.is_configured(),
-            'sessions_count': len(self.settings.list_sessions()),
-            'active_processes': len(self.active_processes),
-            'uptime': datetime.now().isoformat(),  # 拡張：稼働時間計算
-            'version': '1.0.0'
-        }
-
-        return jsonify(status_data)
+        self._refresh_sessions_cache()
+        self._reap_if_pending()
+        suffix = (
+            f',"active_processes":{self._active_count}'
+            f',"uptime":"{_now_iso()}"}}'  # 拡張：稼働時間計算
+        ).encode()
+        return Response(self._status_prefix + suffix, mimetype='application/json')
+
+    # Gunicorn工作进程设置（将来可配置文件化）
+    GUNICORN_WORKER_CLASS = 'gthread'
+    GUNICORN_THREADS = 32
+    GUNICORN_TIMEOUT = 30
 
     def run(self, host: str = '127.0.0.1', port: Optional[int] = None):
         """
         Flask应用程序的执行
 
+        默认通过Gunicorn运行（多工作进程+线程，突发流量下
+        吞吐量远高于Werkzeug开发服务器）。
+        设置环境变量CDB_DEV=1或未安装gunicorn时回退到开发服务器。
+
         扩展点：
-        - WSGI 服务器对应
         - SSL/TLS设置
         - 负载均衡设置
         """
         if port is None:
             port = self.settings.get_port('flask')
 
-        print(f"🌐 Starting Flask HTTP Bridge on {host}:{port}")
-        logger.info(f"Flask app starting on {host}:{port}")
+        logger.info(f"Flask HTTP Bridge starting on {host}:{port}")
+
+        if os.environ.get('CDB_DEV') == '1':
+            self._run_dev_server(host, port)
+            return
+
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            logger.warning(
+                "gunicorn is not installed, falling back to the Flask dev server "
+                "(for production use: pip install gunicorn)"
+            )
+            self._run_dev_server(host, port)
+            return
+
+        flask_app = self.app
+
+        class _GunicornBridge(BaseApplication):
+            """将已构建的Flask应用加载进Gunicorn的适配器"""
+
+            def __init__(self, options: Dict[str, Any]):
+                self.options = options
+                super().__init__()
+
+            def load_config(self):
+                for key, value in self.options.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return flask_app
+
+        options = {
+            'bind': f'{host}:{port}',
+            'workers': 2 * (os.cpu_count() or 1) + 1,
+            'worker_class': self.GUNICORN_WORKER_CLASS,
+            'threads': self.GUNICORN_THREADS,
+            'timeout': self.GUNICORN_TIMEOUT,
+        }
 
         try:
-            # 本番モードで実行
+            _GunicornBridge(options).run()
+        except Exception as e:
+            logger.error(f"Failed to start Flask app: {e}", exc_info=True)
+            sys.exit(1)
+
+    def _run_dev_server(self, host: str, port: int):
+        """
+        Werkzeug开发服务器的执行（开发·回退用）
+        """
+        try:
             self.app.run(
                 host=host,
                 port=port,
@@ -426,6 +1074,24 @@ class FlaskBridgeApp:
             logger.error(error_msg, exc_info=True)
             sys.exit(1)
 
+def create_app() -> Flask:
+    """
+    Gunicorn CLI用的应用工厂
+
+    以独立OS进程并行运行多个工作进程时使用：
+        gunicorn -w $(nproc) -k gthread --threads 32 \\
+            -b 127.0.0.1:5001 'src.flask_app:create_app()'
+
+    注意：_jobs表与转发队列均为每工作进程独立的进程内状态。
+    多工作进程下/jobs/<job_id>与/queue-depth只反映请求恰好
+    命中的那个工作进程——查询任务状态大概率落在受理它的
+    进程之外而返回404。需要跨进程一致的任务可观测性时，
+    应将任务表改为外部存储（Redis等）或以-w 1运行。
+    消息受理与转发本身不受影响（tmux为进程外的共享目标）。
+    """
+    settings = SettingsManager()
+    return FlaskBridgeApp(settings).app
+
 def run_flask_app(port: Optional[int] = None):
     """
     Flask 应用程序的启动函数